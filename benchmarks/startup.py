@@ -0,0 +1,49 @@
+"""Benchmark import and construction time of the NinjaTrader API.
+
+Each measurement runs in a fresh interpreter so module caches do not hide the
+import cost. Run from the repository root:
+
+    python benchmarks/startup.py [--runs N]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SCRIPT = """
+import time
+start = time.perf_counter()
+from nt_trading_api import NinjaTrader
+imported = time.perf_counter()
+nt = NinjaTrader(documents_dir={documents_dir!r}, monitor={monitor})
+constructed = time.perf_counter()
+nt.flatten_everything()
+flattened = time.perf_counter()
+print(imported - start, constructed - imported, flattened - start)
+"""
+
+def measure(monitor: bool, runs: int):
+    samples = []
+    with tempfile.TemporaryDirectory() as documents_dir:
+        script = SCRIPT.format(documents_dir=documents_dir, monitor=monitor)
+        for _ in range(runs):
+            output = subprocess.run(
+                [sys.executable, "-c", script], capture_output=True, text=True, check=True
+            ).stdout
+            samples.append([float(value) for value in output.split()])
+    return [statistics.median(column) for column in zip(*samples)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'mode':<14}{'import':>10}{'construct':>12}{'flatten total':>16}  (median ms)")
+    for monitor in (True, False):
+        imported, constructed, total = measure(monitor, args.runs)
+        mode = "monitor" if monitor else "command-only"
+        print(f"{mode:<14}{imported * 1e3:>10.2f}{constructed * 1e3:>12.2f}{total * 1e3:>16.2f}")
+
+if __name__ == "__main__":
+    main()
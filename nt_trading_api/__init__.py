@@ -1,6 +1,9 @@
 from .core import NinjaTrader
 from .enums import OrderType, Action, TimeInForce, MarketPosition, OrderState, ConnectionState
 from .models import Position, Order, Connection
+from .store import OrderStore
+from .reconciliation import PositionReconciler, PositionDivergence
+from .instruments import Instrument, InstrumentRegistry
 
 __version__ = "0.1.0"
 __all__ = [
@@ -14,4 +17,9 @@ __all__ = [
     "Position",
     "Order",
     "Connection",
+    "OrderStore",
+    "PositionReconciler",
+    "PositionDivergence",
+    "Instrument",
+    "InstrumentRegistry",
 ] 
\ No newline at end of file
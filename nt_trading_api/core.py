@@ -4,19 +4,46 @@ from pathlib import Path
 from typing import Optional, Dict, List
 from decimal import Decimal
 import uuid
-from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+import threading
+from enum import Enum
 
 from .enums import OrderType, Action, TimeInForce, Command
 from .models import Position, Order, Connection
+from .store import OrderStore
+from .reconciliation import PositionReconciler
+from .instruments import InstrumentRegistry
+
+# Order fields that come from the command we sent rather than the order file
+_ORDER_PARAM_FIELDS = (
+    "account", "instrument", "action", "quantity", "order_type", "limit_price",
+    "stop_price", "tif", "oco_id", "strategy", "strategy_id",
+)
 
 class NinjaTrader:
-    def __init__(self, documents_dir: Optional[str] = None):
+    def __init__(
+        self,
+        documents_dir: Optional[str] = None,
+        order_store: Optional[OrderStore] = None,
+        monitor: bool = True,
+        instruments: Optional[InstrumentRegistry] = None,
+        round_prices: bool = False,
+    ):
         """Initialize the NinjaTrader API.
         
         Args:
             documents_dir: Optional path to the Documents directory. If not provided,
                          will use the default Windows Documents location.
+            order_store: Optional store controlling retention of filled, cancelled
+                         and rejected orders. Defaults to an in-memory `OrderStore`
+                         that keeps every order (no retention limit).
+            monitor: Start file monitoring immediately. If False, watchdog is not
+                     imported and no thread is started until the first position,
+                     order or connection query, so command-only scripts start fast.
+            instruments: Optional instrument registry. Prices for registered
+                         instruments are checked against their tick size before
+                         a command is written.
+            round_prices: Round off-tick prices to the nearest tick instead of
+                          raising `ValidationError`.
         """
         if documents_dir is None:
             documents_dir = os.path.expanduser("~/Documents")
@@ -25,42 +52,122 @@ class NinjaTrader:
         self.incoming_dir = self.nt_dir / "incoming"
         self.outgoing_dir = self.nt_dir / "outgoing"
         
-        # Ensure directories exist
-        self.incoming_dir.mkdir(parents=True, exist_ok=True)
-        self.outgoing_dir.mkdir(parents=True, exist_ok=True)
+        self.instruments = instruments
+        self.round_prices = round_prices
         
         # Initialize state
         self._positions: Dict[str, Position] = {}
-        self._orders: Dict[str, Order] = {}
+        self._orders = order_store if order_store is not None else OrderStore(max_terminal_orders=None)
+        self._order_params: Dict[str, dict] = {}
+        self.reconciler = PositionReconciler()
         self._connections: Dict[str, Connection] = {}
+        # Bumped on every position or order update so snapshots can skip unchanged state
+        self._state_version = 0
+        self._monitor_lock = threading.Lock()
+        self._monitoring = False
         
-        # Setup file monitoring
-        self._setup_monitoring()
+        if monitor:
+            # Ensure directories exist
+            self.incoming_dir.mkdir(parents=True, exist_ok=True)
+            self.outgoing_dir.mkdir(parents=True, exist_ok=True)
+            
+            # Setup file monitoring
+            self._setup_monitoring()
+            self._load_outgoing()
+            self._monitoring = True
+
+    def _ensure_monitoring(self) -> None:
+        """Start file monitoring on the first state query if it is not running yet."""
+        if self._monitoring:
+            return
+        with self._monitor_lock:
+            if self._monitoring:
+                return
+            self.outgoing_dir.mkdir(parents=True, exist_ok=True)
+            self._setup_monitoring()
+            self._load_outgoing()
+            # Set only once the existing state is loaded so other threads wait for it
+            self._monitoring = True
+
+    def _load_outgoing(self) -> None:
+        """Pick up the state NinjaTrader wrote before monitoring started."""
+        position_paths = []
+        for entry in os.scandir(self.outgoing_dir):
+            if not entry.is_file():
+                continue
+            if entry.name.endswith("_Position.txt"):
+                position_paths.append(entry.path)
+            else:
+                self._handle_file_update(entry.path)
+        for path in position_paths:
+            self._handle_file_update(path, reconcile=False)
+        # The files form a complete snapshot that already includes the order fills
+        self.reconciler.load_positions(list(self._positions.values()))
 
     def _setup_monitoring(self):
         """Setup file system monitoring for position and order updates."""
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+
         class Handler(FileSystemEventHandler):
             def __init__(self, nt):
                 self.nt = nt
                 
             def on_modified(self, event):
                 if not event.is_directory:
-                    self._handle_file_update(event.src_path)
-                    
-            def _handle_file_update(self, path):
-                filename = os.path.basename(path)
-                if filename.endswith("_Position.txt"):
-                    self._handle_position_update(path)
-                elif filename.endswith(".txt"):
-                    if "_" not in filename:  # Order update
-                        self._handle_order_update(path)
-                    else:  # Connection update
-                        self._handle_connection_update(path)
+                    self.nt._handle_file_update(event.src_path)
         
         self.observer = Observer()
         self.observer.schedule(Handler(self), str(self.outgoing_dir), recursive=False)
         self.observer.start()
 
+    def _handle_file_update(self, path: str, reconcile: bool = True) -> None:
+        """Dispatch an outgoing file to the matching state update."""
+        filename = os.path.basename(path)
+        if not filename.endswith(".txt"):
+            return
+        try:
+            with open(path) as f:
+                content = f.read()
+        except OSError:
+            return
+        if not content.strip():
+            return
+        
+        try:
+            if filename.endswith("_Position.txt"):
+                self._handle_position_update(filename[:-len("_Position.txt")], content, reconcile)
+            elif ";" in content:  # Order update
+                self._handle_order_update(filename[:-len(".txt")], content)
+            else:  # Connection update
+                self._handle_connection_update(filename[:-len(".txt")], content)
+        except ValueError:
+            # Partially written file, the next modification carries the full content
+            return
+
+    def _handle_position_update(self, key: str, content: str, reconcile: bool = True) -> None:
+        instrument, account = key.rsplit("_", 1)
+        position = Position.from_file_content(instrument, account, content)
+        self._positions[key] = position
+        self._state_version += 1
+        if reconcile:
+            self.reconciler.update_position(position)
+
+    def _handle_order_update(self, order_id: str, content: str) -> None:
+        params = self._order_params.pop(order_id, None)
+        existing = self._orders.get(order_id)
+        if existing is not None:
+            params = {name: getattr(existing, name) for name in _ORDER_PARAM_FIELDS}
+        elif params is None:
+            params = dict.fromkeys(_ORDER_PARAM_FIELDS)
+        order = Order.from_file_content(order_id, content, **params)
+        self._orders.put(order)
+        self._state_version += 1
+        self.reconciler.update_order(order)
+
+    def _handle_connection_update(self, name: str, content: str) -> None:
+        self._connections[name] = Connection.from_file_content(name, content)
+
     def _write_command(self, command: Command, **params) -> None:
         """Write a command to the incoming directory."""
         # Generate unique filename
@@ -70,18 +177,36 @@ class NinjaTrader:
         # Build command string
         command_parts = [command.value]
         for key, value in params.items():
-            if value is not None:
-                if isinstance(value, (int, float, Decimal)):
-                    command_parts.append(str(value))
-                else:
-                    command_parts.append(str(value))
-            else:
+            if value is None:
                 command_parts.append("")
+            elif isinstance(value, Enum):
+                command_parts.append(value.value)
+            else:
+                command_parts.append(str(value))
         
         # Write command
-        with open(filepath, "w") as f:
+        try:
+            f = open(filepath, "w")
+        except FileNotFoundError:
+            self.incoming_dir.mkdir(parents=True, exist_ok=True)
+            f = open(filepath, "w")
+        with f:
             f.write("|".join(command_parts))
 
+    def _normalize_price(self, instrument: Optional[str], price: Optional[Decimal]) -> Optional[Decimal]:
+        """Check a price against the instrument's tick size, if it is registered."""
+        if self.instruments is None or instrument is None:
+            return price
+        return self.instruments.normalize_price(instrument, price, self.round_prices)
+
+    def _order_instrument(self, order_id: str) -> Optional[str]:
+        """Get the instrument of an order we placed or have seen updates for."""
+        params = self._order_params.get(order_id)
+        if params is not None:
+            return params["instrument"]
+        order = self._orders.get(order_id)
+        return order.instrument if order is not None else None
+
     def place_order(
         self,
         account: str,
@@ -98,8 +223,24 @@ class NinjaTrader:
         strategy_id: Optional[str] = None,
     ) -> str:
         """Place a new order."""
+        limit_price = self._normalize_price(instrument, limit_price)
+        stop_price = self._normalize_price(instrument, stop_price)
         if order_id is None:
             order_id = str(uuid.uuid4())
+        self._order_params[order_id] = dict(
+            account=account,
+            instrument=instrument,
+            action=action,
+            quantity=quantity,
+            order_type=order_type,
+            limit_price=limit_price,
+            stop_price=stop_price,
+            tif=tif,
+            oco_id=oco_id,
+            strategy=strategy,
+            strategy_id=strategy_id,
+        )
+        self.reconciler.record_place(order_id, instrument, account, action)
             
         self._write_command(
             Command.PLACE,
@@ -136,6 +277,11 @@ class NinjaTrader:
         strategy_id: Optional[str] = None,
     ) -> None:
         """Change an existing order."""
+        if self.instruments is not None:
+            instrument = self._order_instrument(order_id)
+            limit_price = self._normalize_price(instrument, limit_price)
+            stop_price = self._normalize_price(instrument, stop_price)
+        
         self._write_command(
             Command.CHANGE,
             order_id=order_id,
@@ -147,6 +293,7 @@ class NinjaTrader:
 
     def close_position(self, account: str, instrument: str) -> None:
         """Close a position for the given account and instrument."""
+        self.reconciler.record_close(instrument, account)
         self._write_command(Command.CLOSEPOSITION, account=account, instrument=instrument)
 
     def close_strategy(self, strategy_id: str) -> None:
@@ -155,6 +302,7 @@ class NinjaTrader:
 
     def flatten_everything(self) -> None:
         """Cancel all orders and flatten all positions."""
+        self.reconciler.record_flatten()
         self._write_command(Command.FLATTENEVERYTHING)
 
     def reverse_position(
@@ -172,8 +320,24 @@ class NinjaTrader:
         strategy_id: Optional[str] = None,
     ) -> str:
         """Reverse an existing position."""
+        limit_price = self._normalize_price(instrument, limit_price)
+        stop_price = self._normalize_price(instrument, stop_price)
         if order_id is None:
             order_id = str(uuid.uuid4())
+        self._order_params[order_id] = dict(
+            account=account,
+            instrument=instrument,
+            action=None,
+            quantity=quantity,
+            order_type=order_type,
+            limit_price=limit_price,
+            stop_price=stop_price,
+            tif=tif,
+            oco_id=oco_id,
+            strategy=strategy,
+            strategy_id=strategy_id,
+        )
+        self.reconciler.record_reverse(order_id, instrument, account)
             
         self._write_command(
             Command.REVERSEPOSITION,
@@ -194,15 +358,18 @@ class NinjaTrader:
 
     def get_position(self, instrument: str, account: str) -> Optional[Position]:
         """Get the current position for an instrument and account."""
+        self._ensure_monitoring()
         key = f"{instrument}_{account}"
         return self._positions.get(key)
 
     def get_order(self, order_id: str) -> Optional[Order]:
         """Get an order by its ID."""
+        self._ensure_monitoring()
         return self._orders.get(order_id)
 
     def get_connection(self, name: str) -> Optional[Connection]:
         """Get a connection by its name."""
+        self._ensure_monitoring()
         return self._connections.get(name)
 
     def __del__(self):
@@ -0,0 +1,93 @@
+import json
+from dataclasses import dataclass
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional, Dict, Iterable, Union
+
+from .exceptions import ValidationError
+from .models import parse_price
+
+Price = Union[Decimal, float, int, str]
+
+@dataclass(frozen=True)
+class Instrument:
+    root: str
+    tick_size: Decimal
+    point_value: Decimal
+    session: Optional[str] = None
+
+class _Quantizer:
+    __slots__ = ("instrument", "tick_size", "exponent")
+
+    def __init__(self, instrument: str, tick_size: Decimal):
+        self.instrument = instrument
+        self.tick_size = tick_size
+        self.exponent = Decimal(1).scaleb(tick_size.as_tuple().exponent)
+
+    def __call__(self, price: Price, round_to_tick: bool) -> Decimal:
+        if not isinstance(price, Decimal):
+            price = parse_price(repr(price) if isinstance(price, float) else str(price))
+        ticks = price / self.tick_size
+        rounded = ticks.to_integral_value(ROUND_HALF_UP)
+        if rounded != ticks and not round_to_tick:
+            raise ValidationError(
+                f"Price {price} is not a multiple of the tick size {self.tick_size} "
+                f"for {self.instrument}"
+            )
+        return (rounded * self.tick_size).quantize(self.exponent)
+
+class InstrumentRegistry:
+    def __init__(self, instruments: Iterable[Instrument] = ()):
+        """Instrument metadata keyed by root symbol, e.g. "ES" for "ES 12-23"."""
+        self._instruments: Dict[str, Instrument] = {i.root: i for i in instruments}
+        self._quantizers: Dict[str, Optional[_Quantizer]] = {}
+
+    @classmethod
+    def from_file(cls, path: str) -> "InstrumentRegistry":
+        """Load instruments from a JSON file.
+
+        The file maps root symbols to their metadata, for example
+        ``{"ES": {"tick_size": "0.25", "point_value": "50", "session": "CME US Index Futures ETH"}}``.
+        """
+        with open(path) as f:
+            config = json.load(f)
+        return cls(
+            Instrument(
+                root=root,
+                tick_size=Decimal(str(spec["tick_size"])),
+                point_value=Decimal(str(spec["point_value"])),
+                session=spec.get("session"),
+            )
+            for root, spec in config.items()
+        )
+
+    def get(self, instrument: str) -> Optional[Instrument]:
+        """Get the metadata for an instrument name such as "ES 12-23"."""
+        return self._instruments.get(instrument.split(" ", 1)[0])
+
+    def normalize_price(self, instrument: str, price: Optional[Price], round_to_tick: bool = False) -> Optional[Decimal]:
+        """Validate a price against the instrument's tick size.
+
+        Args:
+            instrument: Instrument name such as "ES 12-23".
+            price: Price to normalize. Floats are converted via their shortest repr.
+            round_to_tick: Round off-tick prices to the nearest tick instead of
+                           raising `ValidationError`.
+
+        Returns:
+            The price quantized to the tick size, or the price unchanged if the
+            instrument is not registered.
+        """
+        if price is None:
+            return None
+        try:
+            quantizer = self._quantizers[instrument]
+        except KeyError:
+            spec = self.get(instrument)
+            quantizer = _Quantizer(instrument, spec.tick_size) if spec is not None else None
+            self._quantizers[instrument] = quantizer
+        if quantizer is None:
+            return price
+        return quantizer(price, round_to_tick)
+
+    def __contains__(self, instrument: str) -> bool:
+        return self.get(instrument) is not None
@@ -1,9 +1,15 @@
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 from decimal import Decimal
 
 from .enums import MarketPosition, OrderState, ConnectionState, OrderType, Action, TimeInForce
 
+@lru_cache(maxsize=4096)
+def parse_price(value: str) -> Decimal:
+    """Parse a price string, caching results since prices repeat heavily."""
+    return Decimal(value)
+
 @dataclass
 class Position:
     instrument: str
@@ -20,7 +26,7 @@ class Position:
             account=account,
             market_position=MarketPosition(market_position.strip()),
             quantity=int(quantity.strip()),
-            average_entry_price=Decimal(avg_price.strip())
+            average_entry_price=parse_price(avg_price.strip())
         )
 
 @dataclass
@@ -46,11 +52,14 @@ class Order:
     @classmethod
     def from_file_content(cls, order_id: str, content: str, **kwargs) -> "Order":
         state, filled_amount, avg_price = content.strip().split(";")
+        filled_amount = int(filled_amount.strip())
+        avg_price = avg_price.strip()
         return cls(
             order_id=order_id,
             state=OrderState(state.strip()),
-            filled_amount=int(filled_amount.strip()),
-            average_fill_price=Decimal(avg_price.strip()) if avg_price.strip() else None,
+            filled_amount=filled_amount,
+            # NinjaTrader reports 0 as the average price of an unfilled order
+            average_fill_price=parse_price(avg_price) if avg_price and filled_amount else None,
             **kwargs
         )
 
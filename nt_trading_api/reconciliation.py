@@ -0,0 +1,229 @@
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Set
+
+from .enums import Action, MarketPosition
+from .models import Position, Order
+from .store import TERMINAL_STATES
+
+@dataclass(frozen=True)
+class PositionDivergence:
+    instrument: str
+    account: str
+    expected: int
+    reported: int
+
+    @property
+    def difference(self) -> int:
+        """Signed quantity by which the reported position exceeds the expected one."""
+        return self.reported - self.expected
+
+def signed_quantity(position: Position) -> int:
+    """Net position as a signed quantity, positive for long and negative for short."""
+    if position.market_position == MarketPosition.LONG:
+        return position.quantity
+    if position.market_position == MarketPosition.SHORT:
+        return -position.quantity
+    return 0
+
+class _TrackedOrder:
+    __slots__ = ("key", "sign", "filled", "close_quantity")
+
+    def __init__(self, key: str, sign: int, close_quantity: int = 0):
+        self.key = key
+        self.sign = sign
+        self.filled = 0
+        self.close_quantity = close_quantity
+
+class PositionReconciler:
+    def __init__(self):
+        """Compare the positions implied by our commands with those reported by NinjaTrader.
+
+        The expected net position per instrument and account is updated
+        incrementally from the commands sent and the fills reported in order
+        files. Every reported position is compared against it in O(1), and
+        registered callbacks receive a `PositionDivergence` when they differ.
+        Callbacks run on the thread that delivered the update.
+
+        A mismatch seen while we still have working orders on the same
+        instrument and account is held back, since their fills may not have
+        been reported yet. It is reported once those orders are done, or on
+        the next position update if it is still there.
+
+        Until `load_positions` supplies the starting positions, the first
+        position reported for an instrument and account is taken as its
+        baseline. After that, instruments without a reported position are
+        expected to be flat.
+        """
+        self._expected: Dict[str, int] = {}
+        self._pending: Dict[str, int] = {}
+        self._synchronized = False
+        self._reported: Dict[str, int] = {}
+        self._divergences: Dict[str, PositionDivergence] = {}
+        self._orders: Dict[str, _TrackedOrder] = {}
+        self._working: Dict[str, int] = {}
+        self._held: Set[str] = set()
+        self._callbacks: List[Callable[[PositionDivergence], None]] = []
+        self._lock = threading.RLock()
+
+    def on_divergence(self, callback: Callable[[PositionDivergence], None]) -> None:
+        """Register a callback invoked whenever a new divergence is detected."""
+        self._callbacks.append(callback)
+
+    def record_place(self, order_id: str, instrument: str, account: str, action: Action) -> None:
+        """Track an order sent with the PLACE command."""
+        sign = 1 if Action(action) == Action.BUY else -1
+        key = f"{instrument}_{account}"
+        with self._lock:
+            self._track(key)
+            self._add_order(order_id, _TrackedOrder(key, sign))
+
+    def record_reverse(self, order_id: str, instrument: str, account: str) -> None:
+        """Track an order sent with the REVERSEPOSITION command."""
+        key = f"{instrument}_{account}"
+        with self._lock:
+            self._track(key)
+            current = self._current(key)
+            sign = -1 if current > 0 else 1 if current < 0 else 0
+            self._add_order(order_id, _TrackedOrder(key, sign, close_quantity=current))
+
+    def record_close(self, instrument: str, account: str) -> None:
+        """Expect a flat position after CLOSEPOSITION, which also cancels working orders."""
+        key = f"{instrument}_{account}"
+        with self._lock:
+            self._expected[key] = 0
+            self._pending.pop(key, None)
+            for order_id in [i for i, o in self._orders.items() if o.key == key]:
+                self._remove_order(order_id)
+            self._check(key, notify=False)
+
+    def record_flatten(self) -> None:
+        """Expect every position to be flat after FLATTENEVERYTHING."""
+        with self._lock:
+            self._orders.clear()
+            self._working.clear()
+            for key in self._pending:
+                self._expected[key] = 0
+            self._pending.clear()
+            for key in self._expected:
+                self._expected[key] = 0
+            for key in list(self._divergences):
+                self._check(key, notify=False)
+
+    def update_order(self, order: Order) -> None:
+        """Apply the fills reported for a tracked order."""
+        with self._lock:
+            tracked = self._orders.get(order.order_id)
+            if tracked is None:
+                return
+            delta = order.filled_amount - tracked.filled
+            if delta > 0:
+                tracked.filled = order.filled_amount
+                if tracked.sign != 0:
+                    self._apply(tracked.key, tracked.sign * delta - tracked.close_quantity)
+                    tracked.close_quantity = 0
+            settled = False
+            if order.state in TERMINAL_STATES:
+                settled = self._remove_order(order.order_id)
+            # Fills usually arrive before the position file, so only report a
+            # mismatch that was held back for this key's working orders
+            self._check(tracked.key, notify=settled and tracked.key in self._held)
+
+    def update_position(self, position: Position) -> None:
+        """Compare a reported position against the expected one."""
+        key = f"{position.instrument}_{position.account}"
+        with self._lock:
+            reported = signed_quantity(position)
+            self._reported[key] = reported
+            if key not in self._expected:
+                if self._synchronized:
+                    # A position opened outside this session
+                    self._expected[key] = 0
+                else:
+                    # The first reported position already includes our fills
+                    self._expected[key] = reported
+                    self._pending.pop(key, None)
+            self._check(key, notify=True)
+
+    def load_positions(self, positions: Iterable[Position]) -> None:
+        """Take a complete set of reported positions as the expected ones.
+
+        Pending fills are discarded since the positions already include them,
+        and instruments without a reported position are expected to be flat.
+        """
+        with self._lock:
+            self._pending.clear()
+            for position in positions:
+                key = f"{position.instrument}_{position.account}"
+                reported = signed_quantity(position)
+                self._reported[key] = reported
+                self._expected[key] = reported
+                self._divergences.pop(key, None)
+                self._held.discard(key)
+            self._synchronized = True
+
+    def expected_position(self, instrument: str, account: str) -> int:
+        """Get the expected signed net position for an instrument and account."""
+        with self._lock:
+            return self._current(f"{instrument}_{account}")
+
+    @property
+    def divergences(self) -> Dict[str, PositionDivergence]:
+        """Currently unresolved divergences keyed by instrument and account."""
+        with self._lock:
+            return dict(self._divergences)
+
+    def _add_order(self, order_id: str, tracked: _TrackedOrder) -> None:
+        if order_id not in self._orders:
+            self._working[tracked.key] = self._working.get(tracked.key, 0) + 1
+        self._orders[order_id] = tracked
+
+    def _remove_order(self, order_id: str) -> bool:
+        """Stop tracking an order. Returns True if its key has no working orders left."""
+        tracked = self._orders.pop(order_id)
+        remaining = self._working[tracked.key] - 1
+        if remaining:
+            self._working[tracked.key] = remaining
+            return False
+        del self._working[tracked.key]
+        return True
+
+    def _track(self, key: str) -> None:
+        # Once synchronized, an instrument without a reported position is flat
+        if self._synchronized:
+            self._expected.setdefault(key, 0)
+
+    def _current(self, key: str) -> int:
+        if key in self._expected:
+            return self._expected[key]
+        return self._pending.get(key, 0)
+
+    def _apply(self, key: str, delta: int) -> None:
+        if key in self._expected:
+            self._expected[key] += delta
+        else:
+            self._pending[key] = self._pending.get(key, 0) + delta
+
+    def _check(self, key: str, notify: bool) -> None:
+        reported = self._reported.get(key)
+        if reported is None:
+            return
+        expected = self._expected.get(key, 0)
+        if reported == expected:
+            self._divergences.pop(key, None)
+            self._held.discard(key)
+            return
+        if not notify:
+            return
+        if key in self._working and key not in self._held:
+            self._held.add(key)
+            return
+        self._held.discard(key)
+
+        instrument, account = key.rsplit("_", 1)
+        divergence = PositionDivergence(instrument, account, expected, reported)
+        if self._divergences.get(key) == divergence:
+            return
+        self._divergences[key] = divergence
+        for callback in self._callbacks:
+            callback(divergence)
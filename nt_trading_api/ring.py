@@ -0,0 +1,500 @@
+import time
+import struct
+import uuid
+import logging
+import threading
+from decimal import Decimal
+from multiprocessing import shared_memory
+from typing import Callable, Optional, Tuple
+
+from .enums import OrderType, Action, TimeInForce, MarketPosition, OrderState, Command
+from .exceptions import NinjaTraderError, OrderError, ValidationError
+from .models import Position, Order
+
+# command, action, order_type, tif, quantity, account, instrument, order_id,
+# limit_price, stop_price, oco_id, strategy, strategy_id
+_COMMAND_RECORD = struct.Struct("<BBBBi32s32s40s16s16s40s32s40s")
+_POSITION_RECORD = struct.Struct("<32s32sBi16s")
+# order_id, state, filled_amount, average_fill_price, account, instrument, action, quantity
+_ORDER_RECORD = struct.Struct("<40sBi16s32s32sBi")
+
+_RING_HEADER = struct.Struct("<4sII")
+_SNAPSHOT_HEADER = struct.Struct("<QIIII")
+_COUNTER = struct.Struct("<Q")
+_MAGIC = b"NTCR"
+
+_HEADER_SIZE = 64
+_SNAPSHOT_RETRIES = 1000
+# Head and tail live on separate cache lines to avoid false sharing
+_LANE_HEADER_SIZE = 128
+_TAIL_OFFSET = 64
+
+def _codes(enum_cls) -> Tuple[dict, tuple]:
+    members = tuple(enum_cls)
+    return {member: i + 1 for i, member in enumerate(members)}, (None,) + members
+
+logger = logging.getLogger(__name__)
+
+_ENUM_CODES = {
+    enum_cls: _codes(enum_cls)
+    for enum_cls in (Command, Action, OrderType, TimeInForce, MarketPosition, OrderState)
+}
+
+def _encode_enum(enum_cls, value) -> int:
+    if value is None:
+        return 0
+    return _ENUM_CODES[enum_cls][0][enum_cls(value)]
+
+def _decode_enum(enum_cls, code: int):
+    return _ENUM_CODES[enum_cls][1][code]
+
+def _encode_str(value, size: int, field: str) -> bytes:
+    if value is None:
+        return b""
+    encoded = str(value).encode()
+    if len(encoded) > size:
+        raise ValidationError(f"{field} exceeds {size} bytes: {value!r}")
+    return encoded
+
+def _decode_str(value: bytes) -> Optional[str]:
+    return value.rstrip(b"\0").decode() or None
+
+def _decode_price(value: bytes) -> Optional[Decimal]:
+    text = _decode_str(value)
+    return Decimal(text) if text is not None else None
+
+_attach_lock = threading.Lock()
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing segment without registering it with a resource tracker.
+
+    Only the creating process should unlink the segment. The tracker may be
+    shared with the owner, so registrations are skipped rather than removed.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 registers every attached segment
+        from multiprocessing import resource_tracker
+
+        with _attach_lock:
+            register = resource_tracker.register
+            resource_tracker.register = lambda name, rtype: None
+            try:
+                return shared_memory.SharedMemory(name=name)
+            finally:
+                resource_tracker.register = register
+
+def _find_record(data: bytes, key: bytes, size: int) -> int:
+    """Offset of the record in `data` starting with `key`, or -1."""
+    index = data.find(key)
+    while index != -1 and index % size:
+        index = data.find(key, index + 1)
+    return index
+
+class CommandRing:
+    def __init__(
+        self,
+        lanes: int = 4,
+        capacity: int = 1024,
+        max_positions: int = 256,
+        max_orders: int = 1024,
+        name: Optional[str] = None,
+        on_error: Optional[Callable[[Exception], None]] = None,
+    ):
+        """Create the shared-memory segments in the process that owns NinjaTrader.
+
+        Worker processes submit commands through `CommandProducer` handles. The
+        command segment holds one single-producer/single-consumer ring of fixed
+        binary records per lane: the owner only writes the head counter and the
+        producer only writes the tail counter, so neither side takes a lock.
+        Snapshots are published behind a sequence counter that readers check
+        before and after copying.
+
+        Args:
+            lanes: Number of producer lanes, one per worker process.
+            capacity: Number of command records per lane.
+            max_positions: Number of positions the snapshot can hold.
+            max_orders: Number of orders the snapshot can hold.
+            name: Optional segment name. A random name is used if not provided.
+            on_error: Optional callback for commands that fail to submit. Failed
+                      commands are logged and counted in `failed` either way.
+        """
+        if name is None:
+            name = f"nt_{uuid.uuid4().hex[:16]}"
+        self.name = name
+        self.lanes = lanes
+        self.capacity = capacity
+        self.max_positions = max_positions
+        self.max_orders = max_orders
+        self.on_error = on_error
+        self.failed = 0
+        self._published_version = None
+
+        self._lane_size = _LANE_HEADER_SIZE + capacity * _COMMAND_RECORD.size
+        self._commands = shared_memory.SharedMemory(
+            name=name, create=True, size=_HEADER_SIZE + lanes * self._lane_size
+        )
+        _RING_HEADER.pack_into(self._commands.buf, 0, _MAGIC, lanes, capacity)
+
+        snapshot_size = (
+            _HEADER_SIZE
+            + max_positions * _POSITION_RECORD.size
+            + max_orders * _ORDER_RECORD.size
+        )
+        self._snapshot = shared_memory.SharedMemory(
+            name=f"{name}_snapshot", create=True, size=snapshot_size
+        )
+        _SNAPSHOT_HEADER.pack_into(self._snapshot.buf, 0, 0, 0, 0, max_positions, max_orders)
+
+    def producer(self, lane: int) -> "CommandProducer":
+        """Get a picklable producer handle for the given lane."""
+        if not 0 <= lane < self.lanes:
+            raise ValidationError(f"Lane must be between 0 and {self.lanes - 1}")
+        return CommandProducer(self.name, lane)
+
+    def drain(self, nt) -> int:
+        """Submit all pending commands to a NinjaTrader instance.
+
+        A command that raises is skipped so it cannot block its lane.
+
+        Returns:
+            The number of commands taken from the ring, including failed ones.
+        """
+        buf = self._commands.buf
+        count = 0
+        for lane in range(self.lanes):
+            base = _HEADER_SIZE + lane * self._lane_size
+            head = _COUNTER.unpack_from(buf, base)[0]
+            tail = _COUNTER.unpack_from(buf, base + _TAIL_OFFSET)[0]
+            while head < tail:
+                offset = base + _LANE_HEADER_SIZE + (head % self.capacity) * _COMMAND_RECORD.size
+                try:
+                    self._dispatch(nt, _COMMAND_RECORD.unpack_from(buf, offset))
+                except Exception as e:
+                    self._report(lane, e)
+                finally:
+                    head += 1
+                    count += 1
+                    _COUNTER.pack_into(buf, base, head)
+        return count
+
+    def _report(self, lane: int, error: Exception) -> None:
+        self.failed += 1
+        logger.error("Command from lane %d failed: %s", lane, error)
+        if self.on_error is not None:
+            try:
+                self.on_error(error)
+            except Exception:
+                logger.exception("Command ring error callback failed")
+
+    def _dispatch(self, nt, record) -> None:
+        (command, action, order_type, tif, quantity, account, instrument, order_id,
+         limit_price, stop_price, oco_id, strategy, strategy_id) = record
+        command = _decode_enum(Command, command)
+        if command == Command.PLACE:
+            nt.place_order(
+                account=_decode_str(account),
+                instrument=_decode_str(instrument),
+                action=_decode_enum(Action, action),
+                quantity=quantity,
+                order_type=_decode_enum(OrderType, order_type),
+                limit_price=_decode_price(limit_price),
+                stop_price=_decode_price(stop_price),
+                tif=_decode_enum(TimeInForce, tif),
+                oco_id=_decode_str(oco_id),
+                order_id=_decode_str(order_id),
+                strategy=_decode_str(strategy),
+                strategy_id=_decode_str(strategy_id),
+            )
+        elif command == Command.CANCEL:
+            nt.cancel_order(_decode_str(order_id), strategy_id=_decode_str(strategy_id))
+        elif command == Command.CHANGE:
+            nt.change_order(
+                _decode_str(order_id),
+                quantity=quantity or None,
+                limit_price=_decode_price(limit_price),
+                stop_price=_decode_price(stop_price),
+                strategy_id=_decode_str(strategy_id),
+            )
+
+    def publish(self, nt, force: bool = False) -> bool:
+        """Publish the current positions and orders of a NinjaTrader instance.
+
+        Nothing is written unless the state changed since the last publish.
+        Records with fields too large for the layout are skipped.
+
+        Returns:
+            True if a new snapshot was written.
+        """
+        # A command-only owner starts monitoring on its first state query
+        nt._ensure_monitoring()
+        version = nt._state_version
+        if not force and version == self._published_version:
+            return False
+
+        orders = nt._orders.active_orders()
+        room = self.max_orders - len(orders)
+        if room > 0:
+            orders.extend(nt._orders.terminal_orders()[-room:])
+        # Copy first, the monitoring thread inserts positions concurrently
+        positions = self._pack(self._pack_position, list(nt._positions.values()), self.max_positions)
+        orders = self._pack(self._pack_order, orders, self.max_orders)
+
+        buf = self._snapshot.buf
+        seq = _COUNTER.unpack_from(buf, 0)[0]
+        orders_offset = _HEADER_SIZE + self.max_positions * _POSITION_RECORD.size
+        try:
+            # Odd sequence numbers mark a snapshot being written
+            _SNAPSHOT_HEADER.pack_into(
+                buf, 0, seq + 1,
+                len(positions) // _POSITION_RECORD.size,
+                len(orders) // _ORDER_RECORD.size,
+                self.max_positions, self.max_orders,
+            )
+            buf[_HEADER_SIZE:_HEADER_SIZE + len(positions)] = positions
+            buf[orders_offset:orders_offset + len(orders)] = orders
+        finally:
+            _COUNTER.pack_into(buf, 0, seq + 2)
+        self._published_version = version
+        return True
+
+    @staticmethod
+    def _pack(pack, items, limit: int) -> bytes:
+        records = []
+        for item in items:
+            if len(records) == limit:
+                break
+            try:
+                records.append(pack(item))
+            except (ValidationError, struct.error) as e:
+                logger.warning("Skipping snapshot record: %s", e)
+        return b"".join(records)
+
+    @staticmethod
+    def _pack_position(position: Position) -> bytes:
+        return _POSITION_RECORD.pack(
+            _encode_str(position.instrument, 32, "instrument"),
+            _encode_str(position.account, 32, "account"),
+            _encode_enum(MarketPosition, position.market_position),
+            position.quantity,
+            _encode_str(position.average_entry_price, 16, "average_entry_price"),
+        )
+
+    @staticmethod
+    def _pack_order(order: Order) -> bytes:
+        return _ORDER_RECORD.pack(
+            _encode_str(order.order_id, 40, "order_id"),
+            _encode_enum(OrderState, order.state),
+            order.filled_amount,
+            _encode_str(order.average_fill_price, 16, "average_fill_price"),
+            _encode_str(order.account, 32, "account"),
+            _encode_str(order.instrument, 32, "instrument"),
+            _encode_enum(Action, order.action),
+            order.quantity or 0,
+        )
+
+    def run(self, nt, poll_interval: float = 0.001, stop_event=None) -> None:
+        """Drain commands and publish changed snapshots until `stop_event` is set."""
+        while stop_event is None or not stop_event.is_set():
+            if self.drain(nt) == 0:
+                time.sleep(poll_interval)
+            try:
+                self.publish(nt)
+            except Exception:
+                # The next iteration publishes again since the version was not recorded
+                logger.exception("Publishing the command ring snapshot failed")
+
+    def close(self) -> None:
+        """Close and remove the shared-memory segments."""
+        for shm in (self._commands, self._snapshot):
+            shm.close()
+            shm.unlink()
+
+class CommandProducer:
+    def __init__(self, name: str, lane: int):
+        """Producer handle used by a single worker process.
+
+        Handles are cheap to pickle and attach to the shared memory on first use.
+        Each lane must be used by only one process at a time.
+        """
+        self.name = name
+        self.lane = lane
+        self._commands = None
+        self._snapshot = None
+
+    def __getstate__(self):
+        return {"name": self.name, "lane": self.lane}
+
+    def __setstate__(self, state):
+        self.__init__(state["name"], state["lane"])
+
+    def _attach(self) -> None:
+        commands = _attach(self.name)
+        magic, lanes, capacity = _RING_HEADER.unpack_from(commands.buf, 0)
+        if magic != _MAGIC or not 0 <= self.lane < lanes:
+            commands.close()
+            if magic != _MAGIC:
+                raise ValidationError(f"{self.name} is not a command ring")
+            raise ValidationError(f"Lane must be between 0 and {lanes - 1}")
+        self._commands = commands
+        self._snapshot = _attach(f"{self.name}_snapshot")
+        self._capacity = capacity
+        lane_size = _LANE_HEADER_SIZE + self._capacity * _COMMAND_RECORD.size
+        self._base = _HEADER_SIZE + self.lane * lane_size
+
+    def _submit(self, *record) -> None:
+        if self._commands is None:
+            self._attach()
+        buf = self._commands.buf
+        head = _COUNTER.unpack_from(buf, self._base)[0]
+        tail = _COUNTER.unpack_from(buf, self._base + _TAIL_OFFSET)[0]
+        if tail - head >= self._capacity:
+            raise OrderError(f"Command ring lane {self.lane} is full")
+        offset = self._base + _LANE_HEADER_SIZE + (tail % self._capacity) * _COMMAND_RECORD.size
+        _COMMAND_RECORD.pack_into(buf, offset, *record)
+        # Publishing the new tail makes the record visible to the owner
+        _COUNTER.pack_into(buf, self._base + _TAIL_OFFSET, tail + 1)
+
+    def place_order(
+        self,
+        account: str,
+        instrument: str,
+        action: Action,
+        quantity: int,
+        order_type: OrderType,
+        limit_price: Optional[Decimal] = None,
+        stop_price: Optional[Decimal] = None,
+        tif: TimeInForce = TimeInForce.DAY,
+        oco_id: Optional[str] = None,
+        order_id: Optional[str] = None,
+        strategy: Optional[str] = None,
+        strategy_id: Optional[str] = None,
+    ) -> str:
+        """Place a new order."""
+        if order_id is None:
+            order_id = str(uuid.uuid4())
+
+        self._submit(
+            _encode_enum(Command, Command.PLACE),
+            _encode_enum(Action, action),
+            _encode_enum(OrderType, order_type),
+            _encode_enum(TimeInForce, tif),
+            quantity,
+            _encode_str(account, 32, "account"),
+            _encode_str(instrument, 32, "instrument"),
+            _encode_str(order_id, 40, "order_id"),
+            _encode_str(limit_price, 16, "limit_price"),
+            _encode_str(stop_price, 16, "stop_price"),
+            _encode_str(oco_id, 40, "oco_id"),
+            _encode_str(strategy, 32, "strategy"),
+            _encode_str(strategy_id, 40, "strategy_id"),
+        )
+
+        return order_id
+
+    def cancel_order(self, order_id: str, strategy_id: Optional[str] = None) -> None:
+        """Cancel an order by its ID."""
+        self._submit(
+            _encode_enum(Command, Command.CANCEL), 0, 0, 0, 0, b"", b"",
+            _encode_str(order_id, 40, "order_id"), b"", b"", b"", b"",
+            _encode_str(strategy_id, 40, "strategy_id"),
+        )
+
+    def change_order(
+        self,
+        order_id: str,
+        quantity: Optional[int] = None,
+        limit_price: Optional[Decimal] = None,
+        stop_price: Optional[Decimal] = None,
+        strategy_id: Optional[str] = None,
+    ) -> None:
+        """Change an existing order."""
+        self._submit(
+            _encode_enum(Command, Command.CHANGE), 0, 0, 0, quantity or 0, b"", b"",
+            _encode_str(order_id, 40, "order_id"),
+            _encode_str(limit_price, 16, "limit_price"),
+            _encode_str(stop_price, 16, "stop_price"),
+            b"", b"",
+            _encode_str(strategy_id, 40, "strategy_id"),
+        )
+
+    def _read_snapshot(self) -> Tuple[bytes, bytes]:
+        """Copy the position and order records of a consistent snapshot."""
+        if self._snapshot is None:
+            self._attach()
+        buf = self._snapshot.buf
+        for attempt in range(_SNAPSHOT_RETRIES):
+            seq, n_positions, n_orders, max_positions, _ = _SNAPSHOT_HEADER.unpack_from(buf, 0)
+            if not seq % 2:
+                orders_offset = _HEADER_SIZE + max_positions * _POSITION_RECORD.size
+                positions = bytes(buf[_HEADER_SIZE:_HEADER_SIZE + n_positions * _POSITION_RECORD.size])
+                orders = bytes(buf[orders_offset:orders_offset + n_orders * _ORDER_RECORD.size])
+                if _COUNTER.unpack_from(buf, 0)[0] == seq:
+                    return positions, orders
+            # Back off while the owner is writing, up to 1ms per retry
+            time.sleep(min(1e-6 * 2 ** attempt, 1e-3))
+        raise NinjaTraderError("Timed out waiting for a consistent snapshot")
+
+    def get_position(self, instrument: str, account: str) -> Optional[Position]:
+        """Get the last published position for an instrument and account."""
+        try:
+            key = _encode_str(instrument, 32, "instrument").ljust(32, b"\0")
+            key += _encode_str(account, 32, "account").ljust(32, b"\0")
+        except ValidationError:
+            return None
+        positions, _ = self._read_snapshot()
+        offset = _find_record(positions, key, _POSITION_RECORD.size)
+        if offset == -1:
+            return None
+
+        _, _, market_position, quantity, avg_price = _POSITION_RECORD.unpack_from(positions, offset)
+        return Position(
+            instrument=instrument,
+            account=account,
+            market_position=_decode_enum(MarketPosition, market_position),
+            quantity=quantity,
+            average_entry_price=_decode_price(avg_price),
+        )
+
+    def get_order(self, order_id: str) -> Optional[Order]:
+        """Get the last published state of an order.
+
+        Only the state, fill and the account, instrument, action and quantity
+        are published; the remaining order parameters are None.
+        """
+        try:
+            key = _encode_str(order_id, 40, "order_id").ljust(40, b"\0")
+        except ValidationError:
+            return None
+        _, orders = self._read_snapshot()
+        offset = _find_record(orders, key, _ORDER_RECORD.size)
+        if offset == -1:
+            return None
+
+        (_, state, filled_amount, avg_price, account, instrument, action,
+         quantity) = _ORDER_RECORD.unpack_from(orders, offset)
+        return Order(
+            order_id=order_id,
+            state=_decode_enum(OrderState, state),
+            filled_amount=filled_amount,
+            average_fill_price=_decode_price(avg_price),
+            account=_decode_str(account),
+            instrument=_decode_str(instrument),
+            action=_decode_enum(Action, action),
+            quantity=quantity,
+            order_type=None,
+            limit_price=None,
+            stop_price=None,
+            tif=None,
+            oco_id=None,
+            strategy=None,
+            strategy_id=None,
+        )
+
+    def close(self) -> None:
+        """Detach from the shared memory."""
+        for shm in (self._commands, self._snapshot):
+            if shm is not None:
+                shm.close()
+        self._commands = None
+        self._snapshot = None
@@ -0,0 +1,229 @@
+import sys
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import fields
+from decimal import Decimal
+from enum import Enum
+from typing import Optional, Dict, List, Tuple
+
+from .enums import OrderType, Action, TimeInForce, OrderState
+from .models import Order
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATES = frozenset({OrderState.FILLED, OrderState.CANCELLED, OrderState.REJECTED})
+
+# Converters used to rebuild an Order from a spilled row
+_DECODERS = {
+    "state": OrderState,
+    "average_fill_price": Decimal,
+    "action": Action,
+    "order_type": OrderType,
+    "limit_price": Decimal,
+    "stop_price": Decimal,
+    "tif": TimeInForce,
+}
+
+def _encode(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+def _estimate_size(order: Order) -> int:
+    """Rough number of bytes held by an order and its field values."""
+    return sys.getsizeof(order) + sum(sys.getsizeof(v) for v in vars(order).values())
+
+class _SqliteSpill:
+    """On-disk index for orders evicted from memory.
+
+    Rows are buffered and committed in batches so that eviction does not pay
+    for a commit per order. Buffered orders are still returned by `load`.
+    """
+
+    def __init__(self, path: str, batch_size: int = 256, flush_interval: float = 1.0):
+        import sqlite3
+
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Order] = {}
+        self._last_flush = time.monotonic()
+
+        self._columns = [f.name for f in fields(Order)]
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS orders (%s, PRIMARY KEY (order_id))"
+            % ", ".join(self._columns)
+        )
+        self._insert = "INSERT OR REPLACE INTO orders (%s) VALUES (%s)" % (
+            ", ".join(self._columns),
+            ", ".join("?" for _ in self._columns),
+        )
+        self._select = "SELECT %s FROM orders WHERE order_id = ?" % ", ".join(self._columns)
+
+    def save(self, orders: List[Order]) -> None:
+        for order in orders:
+            self._pending[order.order_id] = order
+        if (
+            len(self._pending) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            self._conn.executemany(
+                self._insert,
+                [tuple(_encode(getattr(o, c)) for c in self._columns) for o in self._pending.values()],
+            )
+            self._conn.commit()
+            self._pending.clear()
+        self._last_flush = time.monotonic()
+
+    def load(self, order_id: str) -> Optional[Order]:
+        order = self._pending.get(order_id)
+        if order is not None:
+            return order
+        row = self._conn.execute(self._select, (order_id,)).fetchone()
+        if row is None:
+            return None
+        values = {}
+        for column, value in zip(self._columns, row):
+            decoder = _DECODERS.get(column)
+            values[column] = decoder(value) if decoder is not None and value is not None else value
+        return Order(**values)
+
+    def close(self) -> None:
+        self.flush()
+        self._conn.close()
+
+class OrderStore:
+    def __init__(
+        self,
+        max_terminal_orders: Optional[int] = 10000,
+        max_terminal_age: Optional[float] = None,
+        max_terminal_bytes: Optional[int] = None,
+        spill_path: Optional[str] = None,
+    ):
+        """Order state store with bounded retention of terminal orders.
+
+        Active orders are always kept in memory. Orders in a terminal state
+        (Filled, Cancelled, Rejected) are kept in least-recently-used order and
+        evicted once any configured limit is exceeded. Limits are enforced when
+        orders are added or looked up.
+
+        Args:
+            max_terminal_orders: Maximum number of terminal orders kept in memory.
+            max_terminal_age: Seconds a terminal order stays in memory after its
+                              last update or lookup.
+            max_terminal_bytes: Approximate memory budget for terminal orders.
+            spill_path: Optional SQLite database path. Evicted orders are written
+                        there in batches and remain available through `get`.
+        """
+        self.max_terminal_orders = max_terminal_orders
+        self.max_terminal_age = max_terminal_age
+        self.max_terminal_bytes = max_terminal_bytes
+
+        self._active: Dict[str, Order] = {}
+        self._terminal: "OrderedDict[str, Tuple[Order, float, int]]" = OrderedDict()
+        self._terminal_bytes = 0
+        self._dropped_logged = False
+        self._lock = threading.RLock()
+        self._spill = _SqliteSpill(spill_path) if spill_path is not None else None
+
+    def put(self, order: Order) -> None:
+        """Insert or update an order."""
+        with self._lock:
+            self._discard_terminal(order.order_id)
+            if order.state in TERMINAL_STATES:
+                self._active.pop(order.order_id, None)
+                size = _estimate_size(order)
+                self._terminal[order.order_id] = (order, time.monotonic(), size)
+                self._terminal_bytes += size
+                self._evict()
+            else:
+                self._active[order.order_id] = order
+
+    def get(self, order_id: str) -> Optional[Order]:
+        """Get an order from memory, falling back to the spill index."""
+        with self._lock:
+            self._evict()
+            order = self._active.get(order_id)
+            if order is not None:
+                return order
+            entry = self._terminal.get(order_id)
+            if entry is not None:
+                self._terminal[order_id] = (entry[0], time.monotonic(), entry[2])
+                self._terminal.move_to_end(order_id)
+                return entry[0]
+            if self._spill is not None:
+                return self._spill.load(order_id)
+            return None
+
+    def active_orders(self) -> List[Order]:
+        """Get all orders that have not reached a terminal state."""
+        with self._lock:
+            self._evict()
+            return list(self._active.values())
+
+    def terminal_orders(self) -> List[Order]:
+        """Get the terminal orders held in memory, most recently used last."""
+        with self._lock:
+            self._evict()
+            return [entry[0] for entry in self._terminal.values()]
+
+    def flush(self) -> None:
+        """Write buffered evicted orders to the spill index, if any."""
+        with self._lock:
+            if self._spill is not None:
+                self._spill.flush()
+
+    def close(self) -> None:
+        """Flush and close the spill index, if any."""
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+
+    def __contains__(self, order_id: str) -> bool:
+        return self.get(order_id) is not None
+
+    def __len__(self) -> int:
+        """Number of orders held in memory."""
+        with self._lock:
+            return len(self._active) + len(self._terminal)
+
+    def _discard_terminal(self, order_id: str) -> None:
+        entry = self._terminal.pop(order_id, None)
+        if entry is not None:
+            self._terminal_bytes -= entry[2]
+
+    def _over_limit(self, now: float) -> bool:
+        if self.max_terminal_orders is not None and len(self._terminal) > self.max_terminal_orders:
+            return True
+        if self.max_terminal_bytes is not None and self._terminal_bytes > self.max_terminal_bytes:
+            return True
+        if self.max_terminal_age is not None:
+            _, inserted, _ = next(iter(self._terminal.values()))
+            return now - inserted > self.max_terminal_age
+        return False
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        evicted = []
+        while self._terminal and self._over_limit(now):
+            _, (order, _, size) = self._terminal.popitem(last=False)
+            self._terminal_bytes -= size
+            evicted.append(order)
+        if not evicted:
+            return
+        if self._spill is not None:
+            self._spill.save(evicted)
+        elif not self._dropped_logged:
+            self._dropped_logged = True
+            logger.warning(
+                "Dropping terminal orders from memory without a spill index; "
+                "get_order will no longer find them"
+            )
@@ -1,12 +1,15 @@
 """Tests for the core NinjaTrader functionality."""
 import os
+import subprocess
+import sys
+import threading
 from decimal import Decimal
 import time
 import pytest
 
 from nt_trading_api import (
     NinjaTrader, OrderType, Action, TimeInForce,
-    MarketPosition, OrderState, ConnectionState
+    MarketPosition, OrderState, ConnectionState, Instrument, InstrumentRegistry
 )
 from nt_trading_api.exceptions import ValidationError
 
@@ -140,4 +143,169 @@ def test_flatten_everything(nt):
     
     with open(os.path.join(nt.incoming_dir, files[0])) as f:
         content = f.read()
-        assert content.startswith("FLATTENEVERYTHING") 
\ No newline at end of file
+        assert content.startswith("FLATTENEVERYTHING")
+
+def test_position_reconciliation(nt, mock_order_update, mock_position_update):
+    """Test that reported positions are reconciled against our orders."""
+    divergences = []
+    nt.reconciler.on_divergence(divergences.append)
+    order_id = nt.place_order(
+        account="TestAccount",
+        instrument="ES 12-23",
+        action=Action.BUY,
+        quantity=2,
+        order_type=OrderType.MARKET
+    )
+    mock_order_update(order_id, "Filled", 2, 4500.50)
+    time.sleep(0.1)
+    mock_position_update("ES 12-23", "TestAccount", "LONG", 1, 4500.50)
+    time.sleep(0.1)
+
+    assert nt.get_order(order_id).instrument == "ES 12-23"
+    assert len(divergences) == 1
+    assert divergences[0].expected == 2
+    assert divergences[0].reported == 1
+
+def test_command_only_mode(temp_dir):
+    """Test that commands can be sent without watchdog or threads."""
+    script = (
+        "import sys, threading\n"
+        "from nt_trading_api import NinjaTrader\n"
+        f"nt = NinjaTrader(documents_dir={temp_dir!r}, monitor=False)\n"
+        "nt.flatten_everything()\n"
+        "assert 'watchdog' not in sys.modules\n"
+        "assert threading.active_count() == 1\n"
+    )
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+    incoming_dir = os.path.join(temp_dir, "NinjaTrader 8", "incoming")
+    files = os.listdir(incoming_dir)
+    assert len(files) == 1
+    assert not os.path.exists(os.path.join(temp_dir, "NinjaTrader 8", "outgoing"))
+
+def test_lazy_monitoring(temp_dir):
+    """Test that monitoring starts and loads existing files on the first query."""
+    nt = NinjaTrader(documents_dir=temp_dir, monitor=False)
+    assert not hasattr(nt, "observer")
+
+    nt.outgoing_dir.mkdir(parents=True)
+    with open(nt.outgoing_dir / "ES 12-23_TestAccount_Position.txt", "w") as f:
+        f.write("SHORT;2;4500.25")
+
+    position = nt.get_position("ES 12-23", "TestAccount")
+    assert position.market_position == MarketPosition.SHORT
+    assert nt.observer.is_alive()
+
+    with open(nt.outgoing_dir / "Sim101.txt", "w") as f:
+        f.write("CONNECTED")
+    time.sleep(0.1)
+    assert nt.get_connection("Sim101").state == ConnectionState.CONNECTED
+
+def test_price_normalization(temp_dir):
+    """Test that prices are checked against the tick size before writing."""
+    registry = InstrumentRegistry([Instrument("ES", Decimal("0.25"), Decimal("50"))])
+    nt = NinjaTrader(documents_dir=temp_dir, monitor=False, instruments=registry)
+
+    with pytest.raises(ValidationError):
+        nt.place_order(
+            account="TestAccount",
+            instrument="ES 12-23",
+            action=Action.BUY,
+            quantity=1,
+            order_type=OrderType.LIMIT,
+            limit_price=4500.13
+        )
+    assert not os.path.exists(nt.incoming_dir)
+
+    nt.round_prices = True
+    order_id = nt.place_order(
+        account="TestAccount",
+        instrument="ES 12-23",
+        action=Action.BUY,
+        quantity=1,
+        order_type=OrderType.LIMIT,
+        limit_price=4500.13
+    )
+    nt.change_order(order_id, limit_price=Decimal("4500.4"))
+
+    commands = []
+    for filename in os.listdir(nt.incoming_dir):
+        with open(os.path.join(nt.incoming_dir, filename)) as f:
+            commands.append(f.read().split("|"))
+    assert all(len(parts) > 1 for parts in commands)
+    assert {parts[0] for parts in commands} == {"PLACE", "CHANGE"}
+    assert any("4500.25" in parts for parts in commands)
+    assert any("4500.50" in parts for parts in commands)
+
+def test_initial_state_is_loaded(temp_dir):
+    """Test that files written before construction are loaded in both modes."""
+    outgoing_dir = os.path.join(temp_dir, "NinjaTrader 8", "outgoing")
+    os.makedirs(outgoing_dir)
+    with open(os.path.join(outgoing_dir, "ES 12-23_TestAccount_Position.txt"), "w") as f:
+        f.write("LONG;4;4500.25")
+
+    for monitor in (True, False):
+        nt = NinjaTrader(documents_dir=temp_dir, monitor=monitor)
+        position = nt.get_position("ES 12-23", "TestAccount")
+        assert position.market_position == MarketPosition.LONG
+        assert position.quantity == 4
+
+def test_reconciliation_with_existing_position(temp_dir):
+    """Test that an existing position is the baseline for new orders."""
+    outgoing_dir = os.path.join(temp_dir, "NinjaTrader 8", "outgoing")
+    os.makedirs(outgoing_dir)
+    with open(os.path.join(outgoing_dir, "ES 12-23_TestAccount_Position.txt"), "w") as f:
+        f.write("LONG;4;4500.25")
+
+    nt = NinjaTrader(documents_dir=temp_dir)
+    order_id = nt.place_order(
+        account="TestAccount",
+        instrument="ES 12-23",
+        action=Action.BUY,
+        quantity=1,
+        order_type=OrderType.MARKET
+    )
+    with open(os.path.join(outgoing_dir, f"{order_id}.txt"), "w") as f:
+        f.write("Filled;1;4500.50")
+    nt._handle_file_update(os.path.join(outgoing_dir, f"{order_id}.txt"))
+
+    assert nt.reconciler.expected_position("ES 12-23", "TestAccount") == 5
+
+def test_default_order_retention_is_unlimited(nt):
+    """Test that the default store keeps every terminal order."""
+    assert nt._orders.max_terminal_orders is None
+
+def test_new_outside_position_is_reported(nt, mock_position_update):
+    """Test that a position opened outside this session after startup is reported."""
+    divergences = []
+    nt.reconciler.on_divergence(divergences.append)
+    nt._handle_file_update(mock_position_update("NQ 12-23", "TestAccount", "LONG", 5, 15000.25))
+
+    assert len(divergences) == 1
+    assert divergences[0].expected == 0
+    assert divergences[0].reported == 5
+
+def test_concurrent_lazy_start_waits_for_state(temp_dir, monkeypatch):
+    """Test that a query during a lazy start waits for the existing state."""
+    nt = NinjaTrader(documents_dir=temp_dir, monitor=False)
+    nt.outgoing_dir.mkdir(parents=True)
+    with open(nt.outgoing_dir / "ES 12-23_TestAccount_Position.txt", "w") as f:
+        f.write("LONG;1;4500.25")
+
+    load_outgoing = nt._load_outgoing
+    loading = threading.Event()
+
+    def slow_load():
+        loading.set()
+        time.sleep(0.1)
+        load_outgoing()
+
+    monkeypatch.setattr(nt, "_load_outgoing", slow_load)
+    first = threading.Thread(target=nt.get_position, args=("ES 12-23", "TestAccount"))
+    first.start()
+    loading.wait()
+
+    # The observer exists now, but this query must wait until loading finishes
+    assert nt.get_position("ES 12-23", "TestAccount").quantity == 1
+    first.join()
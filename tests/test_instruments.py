@@ -0,0 +1,48 @@
+"""Tests for the instrument registry."""
+import json
+import os
+from decimal import Decimal
+import pytest
+
+from nt_trading_api import Instrument, InstrumentRegistry
+from nt_trading_api.exceptions import ValidationError
+
+@pytest.fixture
+def registry():
+    return InstrumentRegistry([
+        Instrument("ES", Decimal("0.25"), Decimal("50")),
+        Instrument("ZN", Decimal("0.015625"), Decimal("1000")),
+    ])
+
+def test_from_file(temp_dir):
+    """Test loading instruments from a JSON config."""
+    path = os.path.join(temp_dir, "instruments.json")
+    with open(path, "w") as f:
+        json.dump({"ES": {"tick_size": "0.25", "point_value": 50, "session": "CME US Index Futures ETH"}}, f)
+
+    registry = InstrumentRegistry.from_file(path)
+    es = registry.get("ES 12-23")
+    assert es.tick_size == Decimal("0.25")
+    assert es.point_value == Decimal("50")
+    assert es.session == "CME US Index Futures ETH"
+    assert "ES 03-24" in registry
+    assert "NQ 12-23" not in registry
+
+def test_on_tick_prices(registry):
+    """Test that on-tick prices pass, including floats."""
+    assert str(registry.normalize_price("ES 12-23", Decimal("4500.25"))) == "4500.25"
+    assert str(registry.normalize_price("ES 12-23", 4500.5)) == "4500.50"
+    assert str(registry.normalize_price("ES 12-23", 4500)) == "4500.00"
+    assert registry.normalize_price("ZN 12-23", Decimal("110.015625")) == Decimal("110.015625")
+    assert registry.normalize_price("ES 12-23", None) is None
+
+def test_off_tick_prices(registry):
+    """Test that off-tick prices are rejected or rounded."""
+    with pytest.raises(ValidationError):
+        registry.normalize_price("ES 12-23", 4500.13)
+    assert str(registry.normalize_price("ES 12-23", 4500.13, round_to_tick=True)) == "4500.25"
+    assert str(registry.normalize_price("ES 12-23", Decimal("4500.1"), round_to_tick=True)) == "4500.00"
+
+def test_unknown_instrument(registry):
+    """Test that prices for unregistered instruments are left unchanged."""
+    assert registry.normalize_price("NQ 12-23", 15000.13) == 15000.13
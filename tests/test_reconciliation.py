@@ -0,0 +1,135 @@
+"""Tests for position reconciliation."""
+from decimal import Decimal
+import pytest
+
+from nt_trading_api import (
+    PositionReconciler, PositionDivergence, Position, Order,
+    MarketPosition, OrderState, Action
+)
+
+def position(market_position: MarketPosition, quantity: int) -> Position:
+    return Position("ES 12-23", "TestAccount", market_position, quantity, Decimal("4500.25"))
+
+def fill(order_id: str, state: OrderState, filled: int) -> Order:
+    return Order(
+        order_id, state, filled, Decimal("4500.25"),
+        "TestAccount", "ES 12-23", None, filled, None, None, None, None, None, None, None,
+    )
+
+@pytest.fixture
+def reconciler():
+    reconciler = PositionReconciler()
+    reconciler.events = []
+    reconciler.on_divergence(reconciler.events.append)
+    reconciler.load_positions([])
+    return reconciler
+
+def test_fills_update_expected_position(reconciler):
+    """Test that partial and full fills are applied incrementally."""
+    reconciler.record_place("buy", "ES 12-23", "TestAccount", Action.BUY)
+    reconciler.update_order(fill("buy", OrderState.PARTFILLED, 1))
+    reconciler.update_order(fill("buy", OrderState.FILLED, 3))
+    reconciler.record_place("sell", "ES 12-23", "TestAccount", Action.SELL)
+    reconciler.update_order(fill("sell", OrderState.FILLED, 1))
+
+    assert reconciler.expected_position("ES 12-23", "TestAccount") == 2
+    reconciler.update_position(position(MarketPosition.LONG, 2))
+    assert reconciler.events == []
+    assert reconciler.divergences == {}
+
+def test_divergence_event(reconciler):
+    """Test that a mismatching reported position raises one event."""
+    reconciler.record_place("buy", "ES 12-23", "TestAccount", Action.BUY)
+    reconciler.update_order(fill("buy", OrderState.FILLED, 2))
+    reconciler.update_position(position(MarketPosition.LONG, 1))
+    reconciler.update_position(position(MarketPosition.LONG, 1))
+
+    assert reconciler.events == [PositionDivergence("ES 12-23", "TestAccount", 2, 1)]
+    assert reconciler.events[0].difference == -1
+
+    reconciler.update_position(position(MarketPosition.LONG, 2))
+    assert reconciler.divergences == {}
+
+def test_position_before_fill_is_held_back(reconciler):
+    """Test that a position reported before the fill of a working order is not reported."""
+    reconciler.record_place("sell", "ES 12-23", "TestAccount", Action.SELL)
+    reconciler.update_position(position(MarketPosition.SHORT, 1))
+    assert reconciler.divergences == {}
+
+    reconciler.update_order(fill("sell", OrderState.FILLED, 1))
+    assert reconciler.divergences == {}
+    assert reconciler.events == []
+
+def test_held_divergence_reported_when_orders_settle(reconciler):
+    """Test that a held mismatch is reported once the working orders are done."""
+    reconciler.record_place("sell", "ES 12-23", "TestAccount", Action.SELL)
+    reconciler.update_position(position(MarketPosition.SHORT, 2))
+    reconciler.update_order(fill("sell", OrderState.FILLED, 1))
+
+    assert reconciler.events == [PositionDivergence("ES 12-23", "TestAccount", -1, -2)]
+
+def test_held_divergence_reported_on_next_position(reconciler):
+    """Test that a mismatch still there on the next position update is reported."""
+    reconciler.record_place("buy", "ES 12-23", "TestAccount", Action.BUY)
+    reconciler.update_position(position(MarketPosition.LONG, 3))
+    assert reconciler.events == []
+
+    reconciler.update_position(position(MarketPosition.LONG, 3))
+    assert reconciler.events == [PositionDivergence("ES 12-23", "TestAccount", 0, 3)]
+
+def test_reverse_position(reconciler):
+    """Test that a reverse order flips the expected position."""
+    reconciler.record_place("buy", "ES 12-23", "TestAccount", Action.BUY)
+    reconciler.update_order(fill("buy", OrderState.FILLED, 2))
+    reconciler.record_reverse("reverse", "ES 12-23", "TestAccount")
+    reconciler.update_order(fill("reverse", OrderState.FILLED, 1))
+
+    assert reconciler.expected_position("ES 12-23", "TestAccount") == -1
+
+def test_close_and_flatten(reconciler):
+    """Test that closing and flattening expect a flat position."""
+    reconciler.record_place("buy", "ES 12-23", "TestAccount", Action.BUY)
+    reconciler.update_order(fill("buy", OrderState.FILLED, 2))
+    reconciler.record_close("ES 12-23", "TestAccount")
+    assert reconciler.expected_position("ES 12-23", "TestAccount") == 0
+
+    reconciler.update_position(position(MarketPosition.FLAT, 0))
+    reconciler.record_place("sell", "ES 12-23", "TestAccount", Action.SELL)
+    reconciler.update_order(fill("sell", OrderState.PARTFILLED, 1))
+    reconciler.record_flatten()
+    reconciler.update_order(fill("sell", OrderState.FILLED, 2))
+
+    assert reconciler.expected_position("ES 12-23", "TestAccount") == 0
+    assert reconciler.events == []
+
+def test_loaded_positions_are_baseline(reconciler):
+    """Test that loaded positions are the starting point for fills."""
+    reconciler.load_positions([position(MarketPosition.LONG, 4)])
+    reconciler.record_place("buy", "ES 12-23", "TestAccount", Action.BUY)
+    reconciler.update_order(fill("buy", OrderState.FILLED, 1))
+
+    assert reconciler.expected_position("ES 12-23", "TestAccount") == 5
+    reconciler.update_position(position(MarketPosition.LONG, 5))
+    assert reconciler.events == []
+
+def test_first_position_is_baseline_before_load():
+    """Test that the first reported position is the baseline until positions are loaded."""
+    reconciler = PositionReconciler()
+    events = []
+    reconciler.on_divergence(events.append)
+    reconciler.record_place("buy", "ES 12-23", "TestAccount", Action.BUY)
+    reconciler.update_order(fill("buy", OrderState.FILLED, 1))
+    assert reconciler.expected_position("ES 12-23", "TestAccount") == 1
+
+    reconciler.update_position(position(MarketPosition.LONG, 5))
+    assert reconciler.expected_position("ES 12-23", "TestAccount") == 5
+
+    reconciler.update_position(position(MarketPosition.SHORT, 3))
+    assert events == [PositionDivergence("ES 12-23", "TestAccount", 5, -3)]
+
+def test_untracked_position_is_reported(reconciler):
+    """Test that a position opened outside this session is reported."""
+    reconciler.update_position(position(MarketPosition.SHORT, 3))
+
+    assert reconciler.expected_position("ES 12-23", "TestAccount") == 0
+    assert reconciler.events == [PositionDivergence("ES 12-23", "TestAccount", 0, -3)]
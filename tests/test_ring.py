@@ -0,0 +1,201 @@
+"""Tests for shared-memory command submission."""
+import os
+import multiprocessing
+import threading
+from decimal import Decimal
+import pytest
+
+from nt_trading_api import (
+    NinjaTrader, OrderType, Action, TimeInForce, MarketPosition, OrderState,
+    Instrument, InstrumentRegistry
+)
+from nt_trading_api.exceptions import NinjaTraderError, OrderError, ValidationError
+
+pytest.importorskip("multiprocessing.shared_memory")
+from nt_trading_api import ring as ring_module
+from nt_trading_api.ring import CommandRing
+
+@pytest.fixture
+def ring():
+    ring = CommandRing(lanes=2, capacity=4)
+    yield ring
+    ring.close()
+
+def read_commands(nt):
+    commands = []
+    for filename in os.listdir(nt.incoming_dir):
+        with open(os.path.join(nt.incoming_dir, filename)) as f:
+            commands.append(f.read().split("|"))
+    return commands
+
+def submit_order(producer):
+    return producer.place_order(
+        account="TestAccount",
+        instrument="ES 12-23",
+        action=Action.SELL,
+        quantity=2,
+        order_type=OrderType.LIMIT,
+        limit_price=Decimal("4500.25"),
+    )
+
+def test_place_order(nt, ring):
+    """Test that a placed order is drained into the incoming directory."""
+    producer = ring.producer(0)
+    order_id = submit_order(producer)
+
+    assert ring.drain(nt) == 1
+    assert ring.drain(nt) == 0
+    parts = read_commands(nt)[0]
+    assert parts[0] == "PLACE"
+    assert "TestAccount" in parts
+    assert "4500.25" in parts
+    assert order_id in parts
+    producer.close()
+
+def test_cancel_and_change_order(nt, ring):
+    """Test cancel and change commands."""
+    producer = ring.producer(1)
+    producer.cancel_order("test_order")
+    producer.change_order("test_order", quantity=3, stop_price=Decimal("4490"))
+
+    assert ring.drain(nt) == 2
+    commands = sorted(read_commands(nt))
+    assert commands[0][:2] == ["CANCEL", "test_order"]
+    assert commands[1][0] == "CHANGE"
+    assert "3" in commands[1]
+    assert "4490" in commands[1]
+    producer.close()
+
+def test_full_lane(ring):
+    """Test that a full lane raises instead of overwriting commands."""
+    producer = ring.producer(0)
+    for _ in range(4):
+        producer.cancel_order("test_order")
+    with pytest.raises(OrderError):
+        producer.cancel_order("test_order")
+    producer.close()
+
+def test_field_too_long(ring):
+    """Test that oversized fields are rejected."""
+    producer = ring.producer(0)
+    with pytest.raises(ValidationError):
+        producer.cancel_order("x" * 41)
+    with pytest.raises(ValidationError):
+        ring.producer(2)
+    producer.close()
+
+def test_snapshot(nt, ring, mock_order_update, mock_position_update):
+    """Test that published state is visible to producers."""
+    nt._handle_file_update(mock_position_update("ES 12-23", "TestAccount", "SHORT", 2, 4500.25))
+    nt._handle_file_update(mock_order_update("test_order", "PartFilled", 1, 4500.25))
+    ring.publish(nt)
+
+    producer = ring.producer(0)
+    position = producer.get_position("ES 12-23", "TestAccount")
+    assert position.market_position == MarketPosition.SHORT
+    assert position.quantity == 2
+    assert position.average_entry_price == Decimal("4500.25")
+
+    order = producer.get_order("test_order")
+    assert order.state == OrderState.PARTFILLED
+    assert order.filled_amount == 1
+    assert producer.get_order("missing") is None
+    producer.close()
+
+def test_worker_process(nt, ring):
+    """Test submission from another process."""
+    process = multiprocessing.get_context("spawn").Process(
+        target=submit_order, args=(ring.producer(0),)
+    )
+    process.start()
+    process.join(30)
+
+    assert process.exitcode == 0
+    assert ring.drain(nt) == 1
+    assert read_commands(nt)[0][0] == "PLACE"
+
+def test_failed_command_does_not_block_lane(temp_dir, ring):
+    """Test that a command that fails is reported and skipped."""
+    registry = InstrumentRegistry([Instrument("ES", Decimal("0.25"), Decimal("50"))])
+    nt = NinjaTrader(documents_dir=temp_dir, monitor=False, instruments=registry)
+    errors = []
+    ring.on_error = errors.append
+
+    producer = ring.producer(0)
+    producer.place_order("TestAccount", "ES 12-23", Action.BUY, 1, OrderType.LIMIT,
+                         limit_price=Decimal("4500.13"))
+    order_id = submit_order(producer)
+
+    assert ring.drain(nt) == 2
+    assert ring.failed == 1
+    assert isinstance(errors[0], ValidationError)
+    commands = read_commands(nt)
+    assert len(commands) == 1
+    assert order_id in commands[0]
+    producer.close()
+
+def test_publish_only_on_change(nt, ring, mock_order_update):
+    """Test that unchanged state is not published again."""
+    assert ring.publish(nt)
+    assert not ring.publish(nt)
+
+    nt._handle_file_update(mock_order_update("test_order", "Working", 0, 0))
+    assert ring.publish(nt)
+    producer = ring.producer(0)
+    assert producer.get_order("test_order").state == OrderState.WORKING
+    producer.close()
+
+def test_publish_skips_oversized_records(nt, ring, mock_order_update):
+    """Test that records too large for the layout are skipped."""
+    nt._handle_file_update(mock_order_update("x" * 41, "Working", 0, 0))
+    nt._handle_file_update(mock_order_update("test_order", "Working", 0, 0))
+    ring.publish(nt)
+
+    producer = ring.producer(0)
+    assert producer.get_order("test_order") is not None
+    assert producer.get_order("x" * 41) is None
+    producer.close()
+
+def test_snapshot_read_timeout(ring, monkeypatch):
+    """Test that readers give up on a snapshot that is never completed."""
+    monkeypatch.setattr(ring_module, "_SNAPSHOT_RETRIES", 3)
+    ring_module._COUNTER.pack_into(ring._snapshot.buf, 0, 1)
+
+    producer = ring.producer(0)
+    with pytest.raises(NinjaTraderError):
+        producer.get_order("test_order")
+    producer.close()
+
+def test_producer_lane_is_checked(ring):
+    """Test that a producer built for a missing lane is rejected on attach."""
+    producer = ring_module.CommandProducer(ring.name, 2)
+    with pytest.raises(ValidationError):
+        producer.cancel_order("test_order")
+
+def test_publish_from_command_only_owner(temp_dir, ring):
+    """Test that an owner without monitoring still publishes existing state."""
+    outgoing_dir = os.path.join(temp_dir, "NinjaTrader 8", "outgoing")
+    os.makedirs(outgoing_dir)
+    with open(os.path.join(outgoing_dir, "ES 12-23_TestAccount_Position.txt"), "w") as f:
+        f.write("LONG;2;4500.25")
+    nt = NinjaTrader(documents_dir=temp_dir, monitor=False)
+
+    assert ring.publish(nt)
+    producer = ring.producer(0)
+    assert producer.get_position("ES 12-23", "TestAccount").quantity == 2
+    producer.close()
+
+def test_run_survives_publish_failure(nt, ring, monkeypatch):
+    """Test that a failing publish does not end the run loop."""
+    stop = threading.Event()
+    calls = []
+
+    def publish(nt):
+        calls.append(nt)
+        if len(calls) == 1:
+            raise RuntimeError("dictionary changed size during iteration")
+        stop.set()
+
+    monkeypatch.setattr(ring, "publish", publish)
+    ring.run(nt, stop_event=stop)
+    assert len(calls) == 2
@@ -0,0 +1,121 @@
+"""Tests for the order state store."""
+import os
+import time
+from decimal import Decimal
+import pytest
+
+from nt_trading_api import (
+    OrderStore, OrderState, OrderType, Action, TimeInForce
+)
+from nt_trading_api.models import Order
+
+def make_order(order_id: str, state: OrderState = OrderState.FILLED) -> Order:
+    return Order(
+        order_id=order_id,
+        state=state,
+        filled_amount=1,
+        average_fill_price=Decimal("4500.25"),
+        account="TestAccount",
+        instrument="ES 12-23",
+        action=Action.BUY,
+        quantity=1,
+        order_type=OrderType.LIMIT,
+        limit_price=Decimal("4500.25"),
+        stop_price=None,
+        tif=TimeInForce.DAY,
+        oco_id=None,
+        strategy=None,
+        strategy_id=None,
+    )
+
+def test_active_orders_are_never_evicted():
+    """Test that the retention limits only apply to terminal orders."""
+    store = OrderStore(max_terminal_orders=1)
+    for i in range(5):
+        store.put(make_order(f"working_{i}", OrderState.WORKING))
+
+    assert len(store) == 5
+    assert len(store.active_orders()) == 5
+
+def test_count_eviction_is_lru():
+    """Test that the least recently used terminal order is evicted first."""
+    store = OrderStore(max_terminal_orders=2)
+    store.put(make_order("a"))
+    store.put(make_order("b"))
+    store.get("a")
+    store.put(make_order("c"))
+
+    assert store.get("a") is not None
+    assert store.get("b") is None
+    assert store.get("c") is not None
+
+def test_order_becoming_terminal_leaves_active_set():
+    """Test that an order moves out of the active set once terminal."""
+    store = OrderStore()
+    store.put(make_order("a", OrderState.WORKING))
+    store.put(make_order("a", OrderState.FILLED))
+
+    assert store.active_orders() == []
+    assert store.get("a").state == OrderState.FILLED
+
+def test_age_eviction():
+    """Test eviction of terminal orders older than the configured age."""
+    store = OrderStore(max_terminal_orders=None, max_terminal_age=0.05)
+    store.put(make_order("old"))
+    time.sleep(0.1)
+    store.put(make_order("new"))
+
+    assert store.get("old") is None
+    assert store.get("new") is not None
+
+def test_memory_eviction():
+    """Test eviction once the memory budget is exceeded."""
+    store = OrderStore(max_terminal_orders=None, max_terminal_bytes=1)
+    store.put(make_order("a"))
+
+    assert len(store) == 0
+
+def test_spill_to_disk(temp_dir):
+    """Test that evicted orders remain available from the spill index."""
+    store = OrderStore(max_terminal_orders=1, spill_path=os.path.join(temp_dir, "orders.db"))
+    original = make_order("a")
+    store.put(original)
+    store.put(make_order("b"))
+
+    assert len(store) == 1
+    assert "a" in store
+    assert store.get("a") == original
+    assert store.get("missing") is None
+    store.close()
+
+def test_age_eviction_on_lookup():
+    """Test that expired orders are evicted by lookups in an idle session."""
+    store = OrderStore(max_terminal_orders=None, max_terminal_age=0.05)
+    store.put(make_order("old"))
+    time.sleep(0.1)
+
+    assert store.active_orders() == []
+    assert len(store) == 0
+
+def test_spill_is_batched(temp_dir):
+    """Test that spilled orders are committed in batches and on close."""
+    path = os.path.join(temp_dir, "orders.db")
+    store = OrderStore(max_terminal_orders=1, spill_path=path)
+    store.put(make_order("a"))
+    store.put(make_order("b"))
+
+    assert store.get("a") is not None
+    store.close()
+
+    reopened = OrderStore(max_terminal_orders=1, spill_path=path)
+    assert reopened.get("a") == make_order("a")
+    reopened.close()
+
+def test_eviction_without_spill_is_logged(caplog):
+    """Test that dropping orders without a spill index is logged once."""
+    store = OrderStore(max_terminal_orders=1)
+    for i in range(3):
+        store.put(make_order(str(i)))
+
+    warnings = [r for r in caplog.records if r.name == "nt_trading_api.store"]
+    assert len(warnings) == 1